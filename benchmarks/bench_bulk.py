@@ -0,0 +1,59 @@
+"""
+Замер BulkScorer против TextBlob(x).sentiment на синтетических текстах.
+
+Печатает время и расхождение оценок: BulkScorer не учитывает отрицания и усилители,
+поэтому отдельно показана ошибка на текстах без not/very.
+
+Запуск из корня проекта: python -m benchmarks.bench_bulk
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+from textblob import TextBlob
+from core.bulk import BulkScorer
+
+
+WORDS = ("good bad great terrible movie plot actor really love hate boring fun the a was is and "
+         "but not very nice awful amazing story slow fast happy sad film i it this").split()
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=5000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    texts = [" ".join(random.choices(WORDS, k=random.randint(5, 15))) for _ in range(args.texts)]
+
+    scorer = BulkScorer()
+    scorer.score(texts[:10])
+
+    started = time.perf_counter()
+    result = scorer.score(texts)
+    bulk = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reference = [TextBlob(x).sentiment for x in texts]
+    blob = time.perf_counter() - started
+
+    polarity = np.array(result["polarity"])
+    subjectivity = np.array(result["subjectivity"])
+    expected_polarity = np.array([x.polarity for x in reference])
+    expected_subjectivity = np.array([x.subjectivity for x in reference])
+    plain = np.array(["not" not in x.split() and "very" not in x.split() for x in texts])
+
+    print(f"texts={len(texts)} bulk={bulk:.3f} s textblob={blob:.3f} s ({blob / bulk:.0f}x)")
+    print(f"polarity: mae={np.abs(polarity - expected_polarity).mean():.3f} "
+          f"corr={np.corrcoef(polarity, expected_polarity)[0, 1]:.2f} "
+          f"same sign={(np.sign(polarity) == np.sign(expected_polarity)).mean():.0%}")
+    print(f"polarity without not/very ({plain.sum()} texts): "
+          f"mae={np.abs(polarity - expected_polarity)[plain].mean():.3f}")
+    print(f"subjectivity: mae={np.abs(subjectivity - expected_subjectivity).mean():.3f} "
+          f"corr={np.corrcoef(subjectivity, expected_subjectivity)[0, 1]:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Замер CorpusStats в режиме sketch.
+
+Сравнивает вытеснение кандидатов через min-кучу (CorpusStats.add_document)
+с полным пересчетом оценок всех кандидатов после каждого документа.
+Точный режим (без sketch) приводится для сравнения.
+
+Запуск из корня проекта: python -m benchmarks.bench_corpus
+"""
+
+from typing import Dict
+import argparse
+import random
+import time
+from core.corpus import CorpusStats
+
+
+class FullRerankStats(CorpusStats):
+
+    """
+    Прежнее поведение: после каждого документа пересчитываются оценки всех кандидатов.
+    """
+
+    def add_document(self, word_counts: Dict[str, int], polarity: float, subjectivity: float) -> None:
+
+        if self.sketch is None:
+            super().add_document(word_counts, polarity, subjectivity)
+            return
+
+        self.documents += 1
+        self.polarity_sum += polarity
+        self.subjectivity_sum += subjectivity
+        self.sentiment[self._bucket(polarity)] += 1
+
+        for word, count in word_counts.items():
+            self.sketch.add(word, count)
+        self._rerank(word_counts)
+
+
+def measure(stats: CorpusStats, documents) -> float:
+
+    started = time.perf_counter()
+    for document in documents:
+        stats.add_document(document, 0.1, 0.2)
+    stats.summary(10)
+
+    return time.perf_counter() - started
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=2000)
+    parser.add_argument('--words', type=int, default=20, help='слов в документе')
+    parser.add_argument('--vocabulary', type=int, default=20000)
+    parser.add_argument('--sketch-width', type=int, default=4096)
+    args = parser.parse_args()
+
+    random.seed(1)
+    vocabulary = ['w%d' % i for i in range(args.vocabulary)]
+    documents = [{x: 1 for x in random.choices(vocabulary, k=args.words)} for _ in range(args.documents)]
+
+    exact = measure(CorpusStats(), documents)
+    full = measure(FullRerankStats(sketch_width=args.sketch_width), documents)
+    heap = measure(CorpusStats(sketch_width=args.sketch_width), documents)
+
+    print(f"documents={args.documents} words={args.words} vocabulary={args.vocabulary}")
+    print(f"exact: {exact:.3f} s")
+    print(f"sketch, full rerank: {full:.3f} s")
+    print(f"sketch, min-heap: {heap:.3f} s ({full / heap:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,39 +10,236 @@
     [antonyms]: Поиск антонимов.
     [ru translate]: Перевод на русский.
 
-В дальнейшем методы будут добавляться.
+Каждый метод регистрируется в core.registry, новые методы добавляются так же.
 """
 
 from textblob import TextBlob, Word
 from textblob.exceptions import NotTranslated
-from typing import Dict, Union, List
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, Union, List, Optional
 import operator
+import re
+import time
+from core.registry import register, Cost
+from core.translators import Translator, get_translator
+from core.documents import Document
+from core.morphology import get_normalizer, NATIVE_LANGUAGES
+
+
+translator = get_translator()
+user_translator = get_translator(for_user=True)
+method_deadline: ContextVar[Optional[float]] = ContextVar('method_deadline', default=None)
+CORRECT_RE = re.compile(r"\w+|[^\w\s]|\s")
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def intermediate(func: Callable) -> property:
+
+    """
+    Промежуточные данные Analyzer: считаются один раз под блокировкой этого экземпляра
+    (self.locks[name]) и хранятся в self.values. Блокировка ждет не дольше дедлайна.
+
+    functools.cached_property не подходит: до Python 3.12 у него одна блокировка на свойство
+    для всех экземпляров, и долгий перевод одного запроса останавливает все остальные.
+    """
+
+    name = func.__name__
+
+    def getter(self: 'Analyzer') -> Any:
+
+        if name in self.values:
+            return self.values[name]
+
+        remaining = self.remaining()
+        lock = self.locks[name]
+        if not lock.acquire(timeout=-1 if remaining is None else remaining):
+            raise DeadlineExceeded
+
+        try:
+            if name not in self.values:
+                self.values[name] = func(self)
+            return self.values[name]
+        finally:
+            lock.release()
+
+    return property(getter, doc=func.__doc__)
 
 
 class Analyzer:
 
     """
     Класс, объединяющий методы обработки и анализа текста.
+
+    Общие промежуточные данные (text, document, synsets, sentiment) считаются один раз
+    и переиспользуются всеми методами. Слова текста хранятся в компактном Document,
+    а не в объектах WordList TextBlob.
+
+    Текст переводится на английский лениво, только для методов с needs_english.
+    Русский текст для подсчета частот разбирается без перевода (native_document).
+
+    deadline - момент time.monotonic(), после которого работа прекращается: методы
+    проверяют его между словами (check_deadline), а переводчик получает остаток времени как timeout.
+    У метода может быть свой, более ранний дедлайн в method_deadline.
     """
 
-    def __init__(self, text):
+    INTERMEDIATES = ('language', 'text', 'native_document', 'document', 'sentiment', 'synsets')
+
+    def __init__(self, text, translator: Translator = translator, deadline: Optional[float] = None,
+                 user_translator: Translator = user_translator):
+
+        self.translator = translator
+        self.user_translator = user_translator
+        self.source = text
+        self.deadline = deadline
+        self.language_error: Optional[str] = None
+        self.suggestions: Dict[str, str] = {}
+        self.values: Dict[str, Any] = {}
+        self.locks: Dict[str, Lock] = {x: Lock() for x in self.INTERMEDIATES}
+
+    def remaining(self) -> Optional[float]:
+
+        """
+        Секунды до ближайшего дедлайна (анализа или метода), None - если дедлайна нет.
+        """
+
+        deadlines = [x for x in (self.deadline, method_deadline.get()) if x is not None]
+        if not deadlines:
+            return None
+
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def check_deadline(self) -> None:
+
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded
+
+    @intermediate
+    def language(self) -> str:
+
+        """
+        Язык текста. Если определить не удалось (ошибка сети, неизвестный язык),
+        считается английским, а причина сохраняется в language_error.
+        """
+
+        try:
+            language = self.translator.detect(self.source, timeout=self.remaining())
+        except Exception as exc:
+            self.language_error = type(exc).__name__
+            return 'en'
+
+        if language is None:
+            self.language_error = "Undetected"
+            return 'en'
+
+        return language
 
-        txt = TextBlob(text)
-        self.text = txt.translate(to='en') if txt.detect_language() != 'en' else txt
+    @intermediate
+    def text(self) -> TextBlob:
 
-    async def wordcount(self) -> Dict[str, str]:
+        """
+        Текст на английском. Для другого языка здесь и происходит перевод.
+        """
+
+        if self.language != 'en':
+            try:
+                return TextBlob(self.translator.translate(
+                    self.source, to='en', source=self.language, timeout=self.remaining()))
+            except NotTranslated:
+                pass
+
+        return TextBlob(self.source)
+
+    @intermediate
+    def document(self) -> Document:
+        return Document.from_text(str(self.text))
+
+    @intermediate
+    def native_document(self) -> Document:
+
+        """
+        Документ на языке оригинала, слова нормализуются по его морфологии.
+        Для языков без своей морфологии - документ английского перевода.
+        """
+
+        if self.language not in NATIVE_LANGUAGES:
+            return self.document
+
+        return Document.from_text(self.source, normalize=get_normalizer(self.language))
+
+    @intermediate
+    def synsets(self) -> Dict[str, List]:
+
+        """
+        Синсеты WordNet для каждого уникального слова текста.
+        """
+
+        synsets: Dict[str, List] = {}
+        for x in self.document.unique_words():
+            self.check_deadline()
+            synsets[x] = Word(x).synsets
+
+        return synsets
+
+    @intermediate
+    def sentiment(self):
+        return self.text.sentiment
+
+    def prepare(self, names) -> None:
+
+        """
+        Считает промежуточные данные names в порядке зависимостей (INTERMEDIATES).
+        Безопасен для вызова из нескольких потоков: каждое значение считается один раз.
+        Блокировки ждут не дольше дедлайна, иначе райзится DeadlineExceeded.
+        """
+
+        for name in self.INTERMEDIATES:
+            if name in names:
+                self._prepare(name)
+
+    def _prepare(self, name: str) -> None:
+
+        if name in self.values:
+            return
+
+        if name != 'language':
+            self._prepare('language')
+        for dependency in self._dependencies(name):
+            self._prepare(dependency)
+
+        getattr(self, name)
+
+    def _dependencies(self, name: str) -> List[str]:
+
+        if name == 'native_document':
+            return [] if self.language in NATIVE_LANGUAGES else ['document']
+        if name == 'synsets':
+            return ['document']
+        if name in ('document', 'sentiment'):
+            return ['text']
+
+        return []
+
+    @register('count-words', needs_english=False, uses=('native_document',))
+    def wordcount(self) -> Dict[str, int]:
 
         """
         Метод, подсчитывающая частотность слов. Отбрасывает ненужные символы и сортирует результат.
+
+        Русские слова считаются по основе (разные формы одного слова - вместе),
+        в ответе показывается первое встреченное написание.
         """
 
-        result = sorted(
-            {x: [y] for x in self.text.word_counts.items() for y in self.text.word_counts.items()},
-            key=operator.itemgetter(1), reverse=True)
+        result = sorted(self.native_document.surface_counts().items(), key=operator.itemgetter(1), reverse=True)
 
         return dict(result)
 
-    async def text_polarity(self) -> Union[str, Dict[str, str]]:
+    @register('emocolor', key='emotional-color', uses=('sentiment',))
+    def text_polarity(self) -> Union[str, Dict[str, str]]:
 
         """
         Метод, анализирующая полярность и субъективность полученного текста.
@@ -51,25 +248,42 @@ class Analyzer:
         """
 
         result = {
-            "Polariry": str(self.text.sentiment.polarity),
-            "Subjectivity": str(self.text.sentiment.subjectivity)}
+            "Polariry": str(self.sentiment.polarity),
+            "Subjectivity": str(self.sentiment.subjectivity)}
 
         return result
 
-    async def get_correct(self) -> Dict[str, Union[str, Dict]]:
+    @register('correct', cost=Cost.expensive, uses=('text', 'document'))
+    def get_correct(self) -> Dict[str, Union[str, Dict]]:
 
         """
         Метод, возвращающая текст без ошибок и варианты правильного написания слов.
         """
 
-        corrected_word = self.text.correct()
-        correctly_vars: Dict = {x: str(Word(x).spellcheck()[0][0]) for x in self.text.words}
+        corrected_word = "".join(self._suggest(x) if x[0].isalnum() or x[0] == '_' else x
+                                 for x in CORRECT_RE.findall(str(self.text)))
+        correctly_vars: Dict = {x: self._suggest(x) for x in self.document.unique_words()}
 
         return {
             "corrected": str(corrected_word),
             "correctly words": correctly_vars}
 
-    async def get_definitions(self) -> Dict[str, Union[List, str]]:
+    def _suggest(self, word: str) -> str:
+
+        """
+        Самый вероятный вариант написания слова. Как и TextBlob.correct, по одному слову,
+        но с проверкой дедлайна перед каждым новым словом и кэшем уже проверенных.
+        """
+
+        suggestion = self.suggestions.get(word)
+        if suggestion is None:
+            self.check_deadline()
+            suggestion = self.suggestions[word] = str(Word(word).spellcheck()[0][0])
+
+        return suggestion
+
+    @register('definitions', cost=Cost.expensive, uses=('document', 'synsets'))
+    def get_definitions(self) -> Dict[str, Union[List, str]]:
 
         """
         Метод для нахождения определений конкретных слов.
@@ -78,8 +292,9 @@ class Analyzer:
         words: List = []
         definitions: List = []
 
-        for x in self.text.words:
-            defins: List = [z for z in Word(x).definitions]
+        for x in self.document.unique_words():
+            self.check_deadline()
+            defins: List = [z.definition() for z in self.synsets[x]]
 
             if len(defins) > 0:
                 words.append(x)
@@ -88,7 +303,8 @@ class Analyzer:
         couple = dict(zip(words, definitions))
         return couple
 
-    async def get_synonyms(self) -> Dict[str, List[str]]:
+    @register('synonyms', cost=Cost.expensive, uses=('document', 'synsets'))
+    def get_synonyms(self) -> Dict[str, List[str]]:
 
         """
         Метод, находящий синонимы каждого слова в полученном тексте.
@@ -99,10 +315,10 @@ class Analyzer:
         words: List = []
         synonims: List = []
 
-        for x in self.text.words:
+        for x in self.document.unique_words():
+            self.check_deadline()
             syns = set()
-            item = Word(x)
-            for synset in item.synsets:
+            for synset in self.synsets[x]:
                 for lem in synset.lemmas():
                     syns.add((lem.name().replace('_', ' ').capitalize()))
 
@@ -115,7 +331,8 @@ class Analyzer:
         result = dict(zip(words, synonims))
         return result
 
-    async def get_antonyms(self) -> Dict[str, str]:
+    @register('antonyms', cost=Cost.expensive, uses=('document', 'synsets'))
+    def get_antonyms(self) -> Dict[str, str]:
 
         """
         Метод, возвращающий список антонимов.
@@ -124,12 +341,12 @@ class Analyzer:
         words: List = []
         antonyms: List = []
 
-        for x in self.text.words:
+        for x in self.document.unique_words():
 
-            xword = Word(x)
+            self.check_deadline()
             x_antonyms: List = []
 
-            for synset in xword.synsets:
+            for synset in self.synsets[x]:
                 for lemmas in synset.lemmas():
                     try:
                         _ = lemmas.antonyms()[0]
@@ -146,15 +363,22 @@ class Analyzer:
         result = dict(zip(words, antonyms))
         return result
 
-    async def ru_translate(self) -> str:
+    @register('translate', cost=Cost.remote, needs_english=False, uses=('language',))
+    def ru_translate(self) -> str:
 
         """
         Ничего необычного. Метод, переводящий с русского на английский или наоборот.
+        Переводит user_translator: пословный офлайн-перевод для показа по умолчанию не используется.
+        Русский текст переводится напрямую, для остальных языков сначала готовится английский text.
         Позже будут новые языки.
         """
 
         try:
-            response = self.text.translate(to="ru")
+            if self.language == 'ru':
+                response = self.user_translator.translate(self.source, to="en", source="ru", timeout=self.remaining())
+            else:
+                self.prepare({'text'})
+                response = self.user_translator.translate(str(self.text), to="ru", source="en", timeout=self.remaining())
         except NotTranslated:
             response = """Unfortunately, the language could not be determined.
             Perhaps the text contains words from several languages. If so, check them separately."""
@@ -0,0 +1,262 @@
+"""
+Модуль с анализом корпуса текстов.
+
+[CountMinSketch]
+    Приблизительный подсчет частот для очень большого словаря.
+
+[CorpusStats]
+    [add document]: Добавление документа в статистику.
+    [merge]:        Слияние двух частичных статистик.
+    [top terms]:    Самые частые слова.
+    [summary]:      Итог по корпусу.
+
+[get pool]:         Общий на все запросы пул процессов.
+[analyze shard]:    Статистика по части корпуса.
+[analyze corpus]:   Статистика по всему корпусу, части считаются в разных процессах.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional, Iterable, Tuple
+import hashlib
+import heapq
+import multiprocessing
+from core.analyzers import Analyzer
+from core.translators import get_offline_translator
+from utils.settings import analysis_config
+
+
+SENTIMENT_BUCKETS: Tuple[str, ...] = ('negative', 'neutral', 'positive')
+
+
+class CountMinSketch:
+
+    """
+    [Sketch]
+
+    Count-min sketch. Оценка частоты никогда не меньше настоящей.
+    Хэши строятся через blake2b, поэтому одинаковы во всех процессах и шарды можно сливать.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self.table: List[List[int]] = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key: str) -> Iterable[Tuple[int, int]]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=4 * self.depth).digest()
+        for row in range(self.depth):
+            yield row, int.from_bytes(digest[row * 4:row * 4 + 4], 'little') % self.width
+
+    def add(self, key: str, count: int = 1) -> int:
+
+        """
+        Добавляет count к ключу и сразу возвращает его новую оценку (хэш считается один раз).
+        """
+
+        estimate = None
+        for row, col in self._indexes(key):
+            self.table[row][col] += count
+            value = self.table[row][col]
+            estimate = value if estimate is None else min(estimate, value)
+
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(self.table[row][col] for row, col in self._indexes(key))
+
+    def merge(self, other: 'CountMinSketch') -> None:
+
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Sketches with different sizes can't be merged")
+
+        for row, other_row in zip(self.table, other.table):
+            for col, value in enumerate(other_row):
+                row[col] += value
+
+
+class CorpusStats:
+
+    """
+    [Stats]
+
+    Частичный агрегат по корпусу: количество документов, частоты слов,
+    суммы полярности и субъективности, распределение тональности.
+    Любые две статистики сливаются через merge, поэтому шарды можно считать независимо.
+
+    Если задан sketch_width, частоты хранятся в CountMinSketch,
+    а для top-N держится только heavy_size самых частых кандидатов.
+    При добавлении документа оцениваются только его слова, а вытеснение идет через min-кучу;
+    полный пересчет оценок кандидатов делается лишь в merge и summary.
+    """
+
+    def __init__(self, sketch_width: Optional[int] = None, sketch_depth: int = 4, heavy_size: int = 1000) -> None:
+        self.documents = 0
+        self.polarity_sum = 0.0
+        self.subjectivity_sum = 0.0
+        self.sentiment: Counter = Counter({x: 0 for x in SENTIMENT_BUCKETS})
+        self.counts: Counter = Counter()
+        self.heavy_size = heavy_size
+        self.heap: List[Tuple[int, str]] = []
+        self.sketch = CountMinSketch(sketch_width, sketch_depth) if sketch_width else None
+
+    def add_document(self, word_counts: Dict[str, int], polarity: float, subjectivity: float) -> None:
+
+        self.documents += 1
+        self.polarity_sum += polarity
+        self.subjectivity_sum += subjectivity
+        self.sentiment[self._bucket(polarity)] += 1
+
+        if self.sketch is None:
+            self.counts.update(word_counts)
+            return
+
+        for word, count in word_counts.items():
+            self._offer(word, self.sketch.add(word, count))
+
+    def merge(self, other: 'CorpusStats') -> 'CorpusStats':
+
+        self.documents += other.documents
+        self.polarity_sum += other.polarity_sum
+        self.subjectivity_sum += other.subjectivity_sum
+        self.sentiment.update(other.sentiment)
+
+        if self.sketch is None and other.sketch is None:
+            self.counts.update(other.counts)
+        elif self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+            self._rerank(other.counts)
+        else:
+            raise ValueError("Exact and sketched statistics can't be merged")
+
+        return self
+
+    def top_terms(self, n: int = 10) -> List[Tuple[str, int]]:
+        return heapq.nlargest(n, self.counts.items(), key=lambda x: x[1])
+
+    def summary(self, top_n: int = 10) -> Dict:
+
+        documents = self.documents or 1
+        if self.sketch is not None:
+            self._rerank(())
+
+        return {
+            "documents": self.documents,
+            "top-terms": dict(self.top_terms(top_n)),
+            "average-polarity": self.polarity_sum / documents,
+            "average-subjectivity": self.subjectivity_sum / documents,
+            "sentiment": dict(self.sentiment),
+            "approximate": self.sketch is not None}
+
+    def _offer(self, word: str, estimate: int) -> None:
+
+        """
+        Обновляет оценку слова среди кандидатов. Если мест нет, слово вытесняет
+        кандидата с наименьшей оценкой, но только если его оценка больше.
+        В куче могут лежать устаревшие записи, они пропускаются при вытеснении.
+        """
+
+        if word in self.counts or len(self.counts) < self.heavy_size:
+            self.counts[word] = estimate
+            heapq.heappush(self.heap, (estimate, word))
+        else:
+            while self.heap and self.counts.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+
+            if self.heap and estimate > self.heap[0][0]:
+                _, evicted = heapq.heappop(self.heap)
+                del self.counts[evicted]
+                self.counts[word] = estimate
+                heapq.heappush(self.heap, (estimate, word))
+
+        if len(self.heap) > 4 * self.heavy_size:
+            self.heap = [(x, y) for y, x in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def _rerank(self, candidates: Iterable[str]) -> None:
+
+        """
+        Пересчитывает оценки всех кандидатов по sketch и оставляет heavy_size самых частых.
+        """
+
+        for word in set(self.counts) | set(candidates):
+            self.counts[word] = self.sketch.estimate(word)
+
+        if len(self.counts) > self.heavy_size:
+            self.counts = Counter(dict(self.top_terms(self.heavy_size)))
+
+        self.heap = [(x, y) for y, x in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    @staticmethod
+    def _bucket(polarity: float) -> str:
+
+        if polarity > 0.05:
+            return 'positive'
+        if polarity < -0.05:
+            return 'negative'
+        return 'neutral'
+
+
+def analyze_shard(texts: List[str], sketch_width: Optional[int] = None) -> CorpusStats:
+
+    """
+    Считает статистику по части корпуса. Выполняется в отдельном процессе.
+
+    Корпус может быть большим, поэтому язык определяется и текст переводится только офлайн:
+    ни одного сетевого запроса на документ. Частоты считаются так же, как в count-words
+    (по языку оригинала); тональность - по английскому тексту, а если офлайн-перевод
+    не удался, по исходному тексту.
+    """
+
+    stats = CorpusStats(sketch_width=sketch_width)
+    translator = get_offline_translator()
+
+    for text in texts:
+        analyzer = Analyzer(text, translator=translator)
+        sentiment = analyzer.sentiment
+        stats.add_document(analyzer.native_document.surface_counts(), sentiment.polarity, sentiment.subjectivity)
+
+    return stats
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+
+    """
+    Пул из analysis_config.CORPUS_PROCESSES процессов, создается один раз при первом запросе.
+    Процессы запускаются через spawn, а не fork, чтобы не копировать потоки сервера.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=analysis_config.CORPUS_PROCESSES, mp_context=multiprocessing.get_context('spawn'))
+
+    return _pool
+
+
+def analyze_corpus(texts: List[str], sketch_width: Optional[int] = None) -> CorpusStats:
+
+    """
+    Делит корпус на шарды по числу процессов общего пула, считает их и сливает результаты.
+    """
+
+    processes = analysis_config.CORPUS_PROCESSES
+    if processes <= 1 or len(texts) < 2:
+        return analyze_shard(texts, sketch_width)
+
+    size = -(-len(texts) // processes)
+    shards = [texts[i:i + size] for i in range(0, len(texts), size)]
+    result = CorpusStats(sketch_width=sketch_width)
+
+    for stats in get_pool().map(analyze_shard, shards, [sketch_width] * len(shards)):
+        result.merge(stats)
+
+    return result
@@ -0,0 +1,163 @@
+"""
+Модуль с компактным представлением текста.
+
+[Vocabulary]
+    Интернированный словарь: слово <-> целочисленный id.
+
+[Token]
+    Запись об одном токене: id слова и его позиция в тексте. Создается только при обходе документа.
+
+[Document]
+    [from text]:    Токенизация текста в массив id.
+    [surface forms]: Первое встреченное написание каждого слова.
+    [words]:        Слова документа по порядку.
+    [unique words]: Уникальные слова документа.
+    [counts]:       Частоты по id слов.
+    [word counts]:  Частоты по словам.
+    [surface counts]: Частоты по первому написанию слова.
+    [nbytes]:       Память под документ.
+"""
+
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional
+import re
+import sys
+
+
+TOKEN_RE = re.compile(r"\w+(?:'\w+)?", re.UNICODE)
+
+
+class Vocabulary:
+
+    """
+    [Vocabulary]
+
+    Каждое нормализованное слово (по умолчанию в нижнем регистре) хранится один раз и получает id.
+    Один словарь можно разделять между документами.
+    """
+
+    __slots__ = ('index', 'words')
+
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.words: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, word: str) -> int:
+
+        ident = self.index.get(word)
+        if ident is None:
+            ident = len(self.words)
+            word = sys.intern(word)
+            self.index[word] = ident
+            self.words.append(word)
+
+        return ident
+
+
+class Token:
+
+    """
+    [Token]
+
+    Создается только при обходе документа, сам документ хранит лишь массив id.
+    """
+
+    __slots__ = ('id', 'start', 'end')
+
+    def __init__(self, ident: int, start: int, end: int) -> None:
+        self.id = ident
+        self.start = start
+        self.end = end
+
+
+class Document:
+
+    """
+    [Document]
+
+    Текст и id его слов в array: 'H' (2 байта на токен), пока словарь меньше 65536 слов,
+    иначе 'I' (4 байта). Позиции токенов не хранятся: когда они нужны
+    (обход по Token, surface forms), текст токенизируется заново.
+    """
+
+    __slots__ = ('text', 'vocab', 'ids')
+
+    def __init__(self, text: str, vocab: Vocabulary, ids: array) -> None:
+        self.text = text
+        self.vocab = vocab
+        self.ids = ids
+
+    @classmethod
+    def from_text(cls, text: str, vocab: Optional[Vocabulary] = None, normalize: Callable[[str], str] = str.lower) -> 'Document':
+
+        vocab = vocab if vocab is not None else Vocabulary()
+        ids = array('I', (vocab.add(normalize(x.group())) for x in TOKEN_RE.finditer(text)))
+
+        if len(vocab) <= 0xFFFF:
+            ids = array('H', ids)
+
+        return cls(text, vocab, ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Token]:
+        return (Token(ident, x.start(), x.end()) for ident, x in zip(self.ids, TOKEN_RE.finditer(self.text)))
+
+    def words(self) -> List[str]:
+        words = self.vocab.words
+        return [words[x] for x in self.ids]
+
+    def unique_words(self) -> List[str]:
+        words = self.vocab.words
+        return [words[x] for x in sorted(set(self.ids))]
+
+    def surface_forms(self) -> Dict[int, str]:
+
+        """
+        Returns:
+            [Dict]: id слова -> его первое написание в тексте (в нижнем регистре).
+        """
+
+        forms: Dict[int, str] = {}
+        for token in self:
+            if token.id not in forms:
+                forms[token.id] = self.text[token.start:token.end].lower()
+
+        return forms
+
+    def counts(self) -> Dict[int, int]:
+
+        """
+        Returns:
+            [Dict]: Частоты только для слов этого документа: id слова -> сколько раз встретилось.
+        """
+
+        return dict(Counter(self.ids))
+
+    def nbytes(self) -> int:
+
+        """
+        Returns:
+            [int]: Память под текст и массив id, без общего словаря.
+        """
+
+        return sys.getsizeof(self.text) + sys.getsizeof(self.ids)
+
+    def word_counts(self) -> Dict[str, int]:
+        words = self.vocab.words
+        return {words[i]: x for i, x in self.counts().items()}
+
+    def surface_counts(self) -> Dict[str, int]:
+
+        """
+        Returns:
+            [Dict]: Частоты, где слово показано первым встреченным написанием, а не нормальной формой.
+        """
+
+        forms = self.surface_forms()
+        return {forms[i]: x for i, x in self.counts().items()}
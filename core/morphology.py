@@ -0,0 +1,29 @@
+"""
+Модуль с нормализацией слов для разных языков.
+
+[get normalizer]: Функция, приводящая слово к нормальной форме для подсчета частот.
+    en: нижний регистр.
+    ru: нижний регистр, ё -> е и стемминг Snowball (nltk), без перевода на английский.
+"""
+
+from functools import lru_cache
+from typing import Callable
+from nltk.stem.snowball import SnowballStemmer
+
+
+NATIVE_LANGUAGES = ('en', 'ru')
+
+
+@lru_cache(maxsize=None)
+def get_normalizer(language: str) -> Callable[[str], str]:
+
+    if language == 'ru':
+        stemmer = SnowballStemmer('russian')
+
+        @lru_cache(maxsize=100000)
+        def normalize(word: str) -> str:
+            return stemmer.stem(word.lower().replace('ё', 'е'))
+
+        return normalize
+
+    return str.lower
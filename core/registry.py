@@ -0,0 +1,63 @@
+"""
+Модуль с реестром методов анализа.
+
+[Cost]:             Класс стоимости метода.
+[AnalysisMethod]:   Описание метода анализа.
+[register]:         Декоратор, добавляющий метод Analyzer в реестр.
+
+Чтобы добавить новый метод, достаточно объявить его в Analyzer с декоратором register.
+Варианты выбора (schemas.words.Choices) и обработчик (utils.handlers.text_handler) берут его из реестра.
+"""
+
+from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
+
+
+class Cost(str, Enum):
+
+    """
+    Класс стоимости метода. Дорогие методы запускаются первыми.
+    """
+
+    cheap = 'cheap'
+    expensive = 'expensive'
+    remote = 'remote'
+
+
+class AnalysisMethod:
+
+    """
+    [Method]
+
+    :param: name - имя метода, которое выбирает пользователь.
+    :param: key - ключ результата в ответе.
+    :param: func - метод Analyzer, выполняющий анализ.
+    :param: cost - класс стоимости.
+    :param: needs_english - нужен ли для метода английский текст.
+    :param: uses - общие промежуточные данные Analyzer (document, synsets, sentiment...).
+    """
+
+    def __init__(self, name: str, key: str, func: Callable, cost: Cost, needs_english: bool, uses: Tuple[str, ...]) -> None:
+        self.name = name
+        self.key = key
+        self.func = func
+        self.cost = cost
+        self.needs_english = needs_english
+        self.uses = uses
+
+
+registry: Dict[str, AnalysisMethod] = {}
+
+
+def register(name: str, *, key: Optional[str] = None, cost: Cost = Cost.cheap,
+             needs_english: bool = True, uses: Tuple[str, ...] = ()) -> Callable:
+
+    """
+    Декоратор, регистрирующий метод анализа под именем name.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        registry[name] = AnalysisMethod(name, key or name, func, cost, needs_english, uses)
+        return func
+
+    return decorator
@@ -17,6 +17,13 @@
     [update user]:          Обновление информации о пользователе.
     [destroy user]:         Удаление пользователя из бд.
 
+[AnalysisService]
+    [hash text]:            Хэш текста, по которому ищутся прошлые анализы.
+    [normalize methods]:    Методы в том виде, в котором они хранятся в бд.
+    [save analysis]:        Сохранение результата анализа.
+    [get analyses]:         Страница истории анализов пользователя.
+    [get by text hash]:     Последний анализ текста с данным хэшем.
+
 [EmailService]
     [send email]:           Отправить сообщение по почте.
     [email for new user]:   Отправить сообщение новому пользователю.
@@ -25,14 +32,16 @@
 from fastapi.encoders import jsonable_encoder
 from jose import jwt
 from passlib.context import CryptContext
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, List
 from datetime import datetime, timedelta
+import hashlib
 from pydantic import EmailStr
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 import emails
 from emails.template import JinjaTemplate
 from models.users import User
+from models.analyses import Analysis
 from schemas.users import UserORM, UserCreate, UserBase
 from utils.settings import token_config, email_config
 
@@ -232,6 +241,109 @@ class UserService:
         return check
 
 
+class AnalysisService:
+
+    """
+    ['Service' for Analysis]
+
+    Набор методов для сохранения и поиска прошлых результатов анализа.
+    """
+
+    def __init__(self, database: Session) -> None:
+        self.database = database
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+
+        """
+        [Hash]
+
+        Returns:
+            [str]: Возвращает sha256 текста в hex.
+        """
+
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def normalize_methods(methods: List[str]) -> str:
+
+        """
+        [Methods]
+
+        Returns:
+            [str]: Возвращает уникальные методы, отсортированные и через запятую.
+        """
+
+        return ",".join(sorted(set(methods)))
+
+    def save_analysis(self, *, user: User, text: str, methods: List[str], result: Dict) -> Analysis:
+
+        """
+        [Save]
+
+        Returns:
+            [Analysis]: Возвращает сохраненный анализ.
+        """
+
+        analysis = Analysis(
+            user_id=user.id,
+            text_hash=self.hash_text(text),
+            methods=self.normalize_methods(methods))
+        analysis.result = result
+
+        self.database.add(analysis)
+        self.database.commit()
+        self.database.refresh(analysis)
+
+        return analysis
+
+    def get_analyses(self, *, user: User, before: Optional[int] = None, limit: int = 20) -> Dict[str, Any]:
+
+        """
+        [History]
+
+        Keyset-пагинация: анализы идут от новых к старым,
+        следующая страница начинается с id меньше переданного before.
+
+        Returns:
+            [Dict]: Возвращает анализы и курсор следующей страницы.
+        """
+
+        query = self.database.query(Analysis).filter(Analysis.user_id == user.id)
+        if before is not None:
+            query = query.filter(Analysis.id < before)
+
+        items = query.order_by(Analysis.id.desc()).limit(limit + 1).all()
+        next_cursor = items[limit - 1].id if len(items) > limit else None
+
+        return {"items": items[:limit], "next_cursor": next_cursor}
+
+    def get_by_text_hash(self, *, user: User, text_hash: str, methods: Optional[List[str]] = None) -> Analysis:
+
+        """
+        [Return Analysis]
+
+        Если переданы methods, ищется анализ именно с этим набором методов.
+
+        Raises:
+            [HTTPException]: Райзится, если анализа с этим хэшем нет.
+
+        Returns:
+            [Analysis]: Возвращает последний анализ текста с данным хэшем.
+        """
+
+        query = self.database.query(Analysis).filter(Analysis.user_id == user.id, Analysis.text_hash == text_hash)
+        if methods:
+            query = query.filter(Analysis.methods == self.normalize_methods(methods))
+
+        analysis = query.order_by(Analysis.id.desc()).first()
+
+        if not analysis:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis is not found")
+
+        return analysis
+
+
 class EmailService:
 
     """
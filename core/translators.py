@@ -0,0 +1,335 @@
+"""
+Модуль с переводчиками.
+
+[Translator]:               Интерфейс переводчика.
+[TimedGoogleTranslator]:    Переводчик TextBlob с timeout запроса.
+[RemoteTranslator]:         Перевод через TextBlob (Google), нужна сеть.
+[PhraseTableTranslator]:    Офлайн-перевод en <-> ru по фразовой таблице из data/.
+[CachedTranslator]:         Кэш переводов по предложениям поверх любого переводчика.
+[FallbackTranslator]:       Офлайн-перевод с запасным удаленным переводчиком.
+
+[get translator]:           Переводчик, собранный по настройкам translation_config.
+[get offline translator]:   Только офлайн-переводчик, без сети.
+"""
+
+from textblob.translate import Translator as GoogleTranslator
+from textblob.exceptions import NotTranslated
+from urllib import request
+from urllib.parse import urlencode
+from cachetools import LRUCache
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import re
+import time
+from utils.settings import translation_config
+
+
+WORD_RE = re.compile(r"\w+(?:'\w+)?", re.UNICODE)
+SENTENCE_SPLIT_RE = re.compile(r"((?<=[.!?…])\s+)")
+CYRILLIC_RE = re.compile(r"[а-яё]", re.IGNORECASE)
+LATIN_RE = re.compile(r"[a-z]", re.IGNORECASE)
+NON_RUSSIAN_CYRILLIC_RE = re.compile(r"[іїєґўђјљњћџѓќѕ]", re.IGNORECASE)
+
+ENGLISH_STOPWORDS = frozenset((
+    'the', 'a', 'an', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'at', 'for', 'with', 'from', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'am', 'do', 'does', 'did', "don't", "doesn't", 'not',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'my', 'your', 'his', 'her', 'its', 'our', 'their',
+    'this', 'that', 'these', 'those', 'there', 'here', 'what', 'who', 'how', 'when', 'where', 'why',
+    'have', 'has', 'had', 'will', 'would', 'can', 'could', 'should', 'if', 'so', 'as', 'very', 'no', 'yes'))
+ENGLISH_STOPWORDS_SHARE = 0.15
+
+
+class Translator:
+
+    """
+    [Interface]
+
+    Переводчик умеет определять язык и переводить текст.
+    detect возвращает None, если язык определить не удалось.
+    Если перевести не удалось, райзится NotTranslated.
+    timeout - сколько секунд можно ждать (None - без ограничения), нужен удаленным переводчикам.
+    """
+
+    def detect(self, text: str, timeout: Optional[float] = None) -> Optional[str]:
+        raise NotImplementedError
+
+    def translate(self, text: str, to: str, source: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        raise NotImplementedError
+
+
+class TimedGoogleTranslator(GoogleTranslator):
+
+    """
+    Переводчик TextBlob, которому можно задать timeout запроса.
+    """
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.timeout = timeout
+
+    def _request(self, url, host=None, type_=None, data=None):
+
+        req = request.Request(url=url, headers=self.headers, data=urlencode(data).encode('utf-8'))
+        if host or type_:
+            req.set_proxy(host=host, type=type_)
+
+        with request.urlopen(req, timeout=self.timeout) as resp:
+            return resp.read().decode('utf-8')
+
+
+class RemoteTranslator(Translator):
+
+    """
+    [Remote]
+
+    Старое поведение: Google-переводчик через TextBlob.
+    """
+
+    def detect(self, text: str, timeout: Optional[float] = None) -> Optional[str]:
+        return TimedGoogleTranslator(timeout).detect(text)
+
+    def translate(self, text: str, to: str, source: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        return TimedGoogleTranslator(timeout).translate(text, from_lang=source or 'auto', to_lang=to)
+
+
+class PhraseTableTranslator(Translator):
+
+    """
+    [Offline]
+
+    Перевод по словарю фраз, жадно по самой длинной известной фразе.
+    Русский определяется по алфавиту, английский - по доле служебных слов;
+    если ни то ни другое, язык считается неизвестным (None).
+    Кириллица с буквами, которых нет в русском (і, ї, є, ґ, ў...), тоже дает None.
+    Болгарский текст без таких букв по алфавиту от русского не отличить.
+
+    Перевод пословный: даже при полном покрытии формы слов не согласуются
+    ("I love you" -> "Я любить ты"), поэтому для показа пользователю он по умолчанию не используется.
+
+    Если таблица покрывает меньше min_coverage слов текста, райзится NotTranslated,
+    а не возвращается текст наполовину на другом языке.
+    """
+
+    def __init__(self, path: str, min_coverage: float = 0.9) -> None:
+
+        self.min_coverage = min_coverage
+        self.tables: Dict[Tuple[str, str], Dict[Tuple[str, ...], str]] = {('en', 'ru'): {}, ('ru', 'en'): {}}
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                en, ru = line.rstrip('\n').split('\t')
+                self.tables['en', 'ru'].setdefault(self._key(en), ru)
+                self.tables['ru', 'en'].setdefault(self._key(ru), en)
+
+        self.known = {pair: {word for phrase in table for word in phrase} for pair, table in self.tables.items()}
+        self.longest = max((len(x) for table in self.tables.values() for x in table), default=1)
+
+    @staticmethod
+    def _key(phrase: str) -> Tuple[str, ...]:
+        return tuple(x.lower() for x in WORD_RE.findall(phrase))
+
+    def detect(self, text: str, timeout: Optional[float] = None) -> Optional[str]:
+
+        if len(CYRILLIC_RE.findall(text)) > len(LATIN_RE.findall(text)):
+            return None if NON_RUSSIAN_CYRILLIC_RE.search(text) else 'ru'
+
+        words = [x.lower() for x in WORD_RE.findall(text)]
+        if words and sum(x in ENGLISH_STOPWORDS for x in words) / len(words) >= ENGLISH_STOPWORDS_SHARE:
+            return 'en'
+
+        return None
+
+    def coverage(self, text: str, source: str, to: str) -> float:
+
+        """
+        Доля слов текста, которые есть в таблице.
+        """
+
+        words = WORD_RE.findall(text)
+        known = self.known[source, to]
+
+        return sum(x.lower() in known for x in words) / len(words) if words else 1.0
+
+    def translate(self, text: str, to: str, source: Optional[str] = None, timeout: Optional[float] = None) -> str:
+
+        source = source or self.detect(text)
+        if source == to or (source, to) not in self.tables:
+            raise NotTranslated("Translation API returned the input string unchanged.")
+
+        if self.coverage(text, source, to) < self.min_coverage:
+            raise NotTranslated("Phrase table doesn't cover this text.")
+
+        table = self.tables[source, to]
+        matches = list(WORD_RE.finditer(text))
+        words = [x.group().lower() for x in matches]
+        result: List[str] = []
+        position = 0
+        i = 0
+
+        while i < len(matches):
+            for size in range(min(self.longest, len(matches) - i), 0, -1):
+                phrase = table.get(tuple(words[i:i + size]))
+                if phrase is not None:
+                    result.append(text[position:matches[i].start()])
+                    result.append(phrase.capitalize() if matches[i].group()[0].isupper() else phrase)
+                    position = matches[i + size - 1].end()
+                    i += size
+                    break
+            else:
+                i += 1
+
+        result.append(text[position:])
+        translated = "".join(result)
+
+        if translated == text:
+            raise NotTranslated("Translation API returned the input string unchanged.")
+
+        return translated
+
+
+class CachedTranslator(Translator):
+
+    """
+    [Cache]
+
+    Делит текст на предложения и переводит только те, которых еще нет в кэше,
+    одним запросом к backend: предложения склеиваются через перевод строки.
+    Если backend вернул другое число строк или отказался переводить всё вместе,
+    предложения переводятся по одному.
+
+    Разделители между предложениями (пробелы, переводы строк) сохраняются как в исходном тексте.
+    Предложение, которое не переводится, остается как есть; NotTranslated райзится,
+    только если не переведено ничего.
+    """
+
+    def __init__(self, backend: Translator, maxsize: int = 10000) -> None:
+        self.backend = backend
+        self.cache: LRUCache = LRUCache(maxsize=maxsize)
+        self.lock = Lock()
+
+    def detect(self, text: str, timeout: Optional[float] = None) -> Optional[str]:
+        return self.backend.detect(text, timeout=timeout)
+
+    def translate(self, text: str, to: str, source: Optional[str] = None, timeout: Optional[float] = None) -> str:
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        source = source or self.detect(text, timeout=timeout)
+
+        parts = SENTENCE_SPLIT_RE.split(text)
+        sentences = {x.strip() for x in parts[::2] if x.strip()}
+
+        with self.lock:
+            translated = {x: self.cache[x, source, to] for x in sentences if (x, source, to) in self.cache}
+
+        misses = [x for x in sentences if x not in translated]
+        if misses:
+            found = self._translate_batch(misses, to, source, deadline)
+            with self.lock:
+                for sentence, result in found.items():
+                    self.cache[sentence, source, to] = result
+            translated.update(found)
+
+        parts[::2] = [x.replace(x.strip(), translated.get(x.strip(), x.strip()), 1) if x.strip() else x for x in parts[::2]]
+        result = "".join(parts)
+
+        if result == text:
+            raise NotTranslated("Translation API returned the input string unchanged.")
+
+        return result
+
+    def _translate_batch(self, sentences: List[str], to: str, source: Optional[str], deadline: Optional[float]) -> Dict[str, str]:
+
+        """
+        Returns:
+            [Dict]: Предложение -> перевод. Непереведенных предложений в словаре нет.
+        """
+
+        def left() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        batch = "\n".join(x.replace("\n", " ") for x in sentences)
+        try:
+            lines = self.backend.translate(batch, to=to, source=source, timeout=left()).split("\n")
+            if len(lines) == len(sentences):
+                return dict(zip(sentences, lines))
+        except NotTranslated:
+            if len(sentences) == 1:
+                return {}
+
+        found: Dict[str, str] = {}
+        for sentence in sentences:
+            try:
+                found[sentence] = self.backend.translate(sentence, to=to, source=source, timeout=left())
+            except NotTranslated:
+                continue
+
+        return found
+
+
+class FallbackTranslator(Translator):
+
+    """
+    [Fallback]
+
+    Сначала офлайн. Удаленный переводчик используется, когда офлайн не может определить язык
+    или не переводит текст (пара языков вне таблицы, слишком малое покрытие).
+    """
+
+    def __init__(self, offline: PhraseTableTranslator, remote: Translator) -> None:
+        self.offline = offline
+        self.remote = remote
+
+    def detect(self, text: str, timeout: Optional[float] = None) -> Optional[str]:
+
+        language = self.offline.detect(text)
+        if language is None:
+            try:
+                language = self.remote.detect(text, timeout=timeout)
+            except Exception:
+                language = None
+
+        return language
+
+    def translate(self, text: str, to: str, source: Optional[str] = None, timeout: Optional[float] = None) -> str:
+
+        try:
+            return self.offline.translate(text, to=to, source=source)
+        except NotTranslated:
+            if source == to:
+                raise
+
+        return self.remote.translate(text, to=to, source=source, timeout=timeout)
+
+
+def get_translator(for_user: bool = False) -> Translator:
+
+    """
+    Собирает переводчик по настройкам: офлайн или удаленный, с запасным вариантом и кэшем.
+
+    for_user - перевод, который увидит пользователь (метод translate). Пословный офлайн-перевод
+    для него используется, только если OFFLINE_USER_TRANSLATION или удаленный переводчик выключен.
+    """
+
+    remote_allowed = translation_config.TRANSLATION_BACKEND == 'remote' or translation_config.REMOTE_FALLBACK
+    if for_user and remote_allowed and not translation_config.OFFLINE_USER_TRANSLATION:
+        return CachedTranslator(RemoteTranslator(), maxsize=translation_config.CACHE_SIZE)
+
+    if translation_config.TRANSLATION_BACKEND == 'remote':
+        backend: Translator = RemoteTranslator()
+    else:
+        backend = PhraseTableTranslator(translation_config.PHRASE_TABLE, min_coverage=translation_config.MIN_COVERAGE)
+        if translation_config.REMOTE_FALLBACK:
+            backend = FallbackTranslator(backend, RemoteTranslator())
+
+    return CachedTranslator(backend, maxsize=translation_config.CACHE_SIZE)
+
+
+def get_offline_translator() -> Translator:
+
+    """
+    Офлайн-переводчик с кэшем, без удаленного запасного варианта. Никогда не ходит в сеть.
+    """
+
+    backend = PhraseTableTranslator(translation_config.PHRASE_TABLE, min_coverage=translation_config.MIN_COVERAGE)
+    return CachedTranslator(backend, maxsize=translation_config.CACHE_SIZE)
@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from core.database import DataBase, Engine
+from utils.middlewares import CompressionMiddleware
 import routers
 
 
 DataBase.metadata.create_all(bind=Engine)
 
 app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
 app.include_router(routers.router)
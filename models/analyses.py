@@ -0,0 +1,47 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Dict
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from core.database import DataBase
+
+
+class Analysis(DataBase):
+
+    """
+    [Base]
+
+    Модель сохраненного результата анализа текста.
+    :param: text_hash - sha256 от исходного текста, по нему ищутся прошлые результаты.
+    :param: methods - отсортированные через запятую методы анализа.
+    :param: compressed_result - результат анализа, JSON сжатый zlib.
+    """
+
+    __tablename__ = 'analyses'
+    __table_args__ = (
+        Index('ix_analyses_user_id_id', 'user_id', 'id'),
+        Index('ix_analyses_user_id_text_hash', 'user_id', 'text_hash'))
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    text_hash = Column(String(64), nullable=False)
+    methods = Column(String, nullable=False)
+    compressed_result = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    user = relationship('User', back_populates='analyses')
+
+    @property
+    def result(self) -> Dict:
+
+        """
+        Распакованный результат анализа.
+        """
+
+        return json.loads(zlib.decompress(self.compressed_result).decode('utf-8'))
+
+    @result.setter
+    def result(self, value: Dict) -> None:
+        self.compressed_result = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
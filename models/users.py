@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, Integer
+from sqlalchemy.orm import relationship
 from core.database import DataBase
 
 
@@ -17,3 +18,5 @@ class User(DataBase):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String, nullable=False)
+
+    analyses = relationship('Analysis', back_populates='user', cascade='all, delete-orphan')
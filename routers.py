@@ -2,26 +2,32 @@ from fastapi import Depends, HTTPException, status, Response, Query, APIRouter,
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.encoders import jsonable_encoder
 from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import EmailStr
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from datetime import timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 from models.users import User
 from schemas.users import UserCreate, UserORM, UserBase
+from schemas.analyses import AnalysisPage, AnalysisResult
 from schemas.tokens import TokenData
-from schemas.words import Choices
-from core.services import UserService, auth_service, EmailService
+from schemas.words import Choices, Corpus
+from core.services import UserService, AnalysisService, auth_service, EmailService
 from core.database import get_db
 from core.authentication import AuthWithCookie
-from utils.handlers import text_handler
-from utils.settings import token_config
+from core.corpus import analyze_corpus
+from core.bulk import BulkScorer
+from utils.handlers import text_handler, compact_response
+from utils.settings import token_config, analysis_config
 
 
 router = APIRouter()
 auth_scheme = AuthWithCookie(tokenUrl='/token')
 user_service = UserService(database=get_db())
+analysis_service = AnalysisService(database=get_db())
 email_service = EmailService()
 
 
@@ -163,8 +169,53 @@ async def put_me_info(email: EmailStr = Query(None), username: str = Query(None)
     return user_updated
 
 
-@router.post('/analyze', dependencies=[Depends(get_current_user)], tags=['Analyzing'])
-async def send_text_for_analyze(text: str, method: List[Choices] = Query(default=Choices.translate)) -> Dict:
+@router.get('/me/analyses', tags=['Me'], response_model=AnalysisPage)
+async def get_my_analyses(
+        before: Optional[int] = Query(None), limit: int = Query(20, ge=1, le=100),
+        user: User = Depends(get_current_user)) -> Dict:
+
+    """
+    [History]
+
+    Info:
+        История анализов пользователя, от новых к старым.
+        Для следующей страницы передайте next_cursor в параметр before.
+
+    Returns:
+        [AnalysisPage]: Возвращает страницу анализов без результатов.
+    """
+
+    return analysis_service.get_analyses(user=user, before=before, limit=limit)
+
+
+@router.get('/me/analyses/{text_hash}', tags=['Me'], response_model=AnalysisResult)
+async def get_my_analysis(
+        text_hash: str, method: List[Choices] = Query(None),
+        user: User = Depends(get_current_user)) -> AnalysisResult:
+
+    """
+    [History]
+
+    Info:
+        Поиск прошлого анализа по sha256 текста.
+        Если передан method, ищется анализ именно с этим набором методов.
+
+    Raises:
+        HTTPException: Райзится, если такого анализа нет.
+
+    Returns:
+        [AnalysisResult]: Возвращает последний анализ этого текста вместе с результатом.
+    """
+
+    methods = [x.value for x in method] if method else None
+    return analysis_service.get_by_text_hash(user=user, text_hash=text_hash, methods=methods)
+
+
+@router.post('/analyze', tags=['Analyzing'], response_class=ORJSONResponse)
+async def send_text_for_analyze(
+        text: str, method: List[Choices] = Query(default=Choices.translate), compact: bool = Query(False),
+        budget: float = Query(analysis_config.REQUEST_BUDGET, gt=0, le=analysis_config.MAX_REQUEST_BUDGET),
+        user: User = Depends(get_current_user)) -> ORJSONResponse:
 
     """
     [Analyze]
@@ -172,10 +223,59 @@ async def send_text_for_analyze(text: str, method: List[Choices] = Query(default
     Info:
         Функция, использующая текстовый обработчик. Доступна только авторизованным пользователям.
         Пользователь может выбрать как 1 вариант обработки, так и несколько.
+        Результат сохраняется в историю анализов пользователя, только если все методы завершились успешно.
+        При compact=true строки результата передаются через общую таблицу (см. compact_response).
+        budget - время в секундах на весь анализ. Методы, не уложившиеся в свой дедлайн,
+        не попадают в results, их статус виден в status.
 
     Returns:
         [Dict] Возвращает результаты анализа текста.
     """
 
-    analyzed = await text_handler(method=method, text=text)
-    return analyzed
+    analyzed = await text_handler(method=method, text=text, budget=budget)
+    if all(x["status"] == "ok" for x in analyzed["status"].values()):
+        analysis_service.save_analysis(user=user, text=text, methods=[x.value for x in method], result=analyzed)
+
+    if compact:
+        return ORJSONResponse(content=compact_response(analyzed))
+
+    return ORJSONResponse(content=analyzed)
+
+
+@router.post('/corpus', dependencies=[Depends(get_current_user)], tags=['Analyzing'], response_class=ORJSONResponse)
+async def send_corpus_for_analyze(
+        corpus: Corpus, top: int = Query(10, ge=1, le=1000),
+        sketch_width: Optional[int] = Query(None, ge=16)) -> ORJSONResponse:
+
+    """
+    [Corpus]
+
+    Info:
+        Частотность слов и средняя тональность по всему корпусу, а не по каждому документу.
+        Корпус делится на части, которые считаются в общем пуле процессов (CORPUS_PROCESSES).
+        При заданном sketch_width частоты считаются приблизительно, через count-min sketch.
+
+    Returns:
+        [Dict] Возвращает top-N слов и распределение тональности.
+    """
+
+    stats = await run_in_threadpool(analyze_corpus, corpus.texts, sketch_width)
+    return ORJSONResponse(content=stats.summary(top_n=top))
+
+
+@router.post('/bulk', dependencies=[Depends(get_current_user)], tags=['Analyzing'], response_class=ORJSONResponse)
+async def send_bulk_for_score(corpus: Corpus, top: int = Query(10, ge=1, le=1000)) -> ORJSONResponse:
+
+    """
+    [Bulk]
+
+    Info:
+        Быстрая оценка тональности большого пакета коротких английских текстов.
+        Считается векторно через NumPy, без перевода и без TextBlob на каждый текст.
+
+    Returns:
+        [Dict] Возвращает полярность и субъективность каждого текста и top-N слов пакета.
+    """
+
+    scored = await run_in_threadpool(BulkScorer().score, corpus.texts, top)
+    return ORJSONResponse(content=scored)
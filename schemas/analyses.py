@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class AnalysisORM(BaseModel):
+
+    """
+    [ORM]
+
+    pydantic-модель сохраненного анализа, без самого результата.
+    """
+
+    id: int
+    text_hash: str
+    methods: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class AnalysisResult(AnalysisORM):
+
+    """
+    [Result]
+
+    pydantic-модель сохраненного анализа вместе с результатом.
+    """
+
+    result: Dict
+
+
+class AnalysisPage(BaseModel):
+
+    """
+    [Page]
+
+    Страница истории анализов.
+    :param: next_cursor - id, который нужно передать в before для получения следующей страницы.
+    """
+
+    items: List[AnalysisORM]
+    next_cursor: Optional[int] = None
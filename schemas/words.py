@@ -1,16 +1,21 @@
 from enum import Enum
+from pydantic import BaseModel
+from typing import List
+from core.registry import registry
+import core.analyzers  # noqa: F401
 
 
-class Choices(str, Enum):
+Choices = Enum('Choices', [(name.replace('-', '_'), name) for name in registry], type=str)
+Choices.__doc__ = """
+    Класс, созданный для создания вариантов выбора анализа текста.
+    Варианты берутся из реестра методов (core.registry).
+    """
+
+
+class Corpus(BaseModel):
 
     """
-    Класс, созданный для создания вариантов выбора анализа текста.
+    Корпус документов для общего анализа.
     """
 
-    translate = 'translate'
-    emocolor = 'emocolor'
-    count_words = 'count-words'
-    synonyms = 'synonyms'
-    antonyms = 'antonyms'
-    definitions = 'definitions'
-    correct = 'correct'
+    texts: List[str]
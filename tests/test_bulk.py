@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from core.bulk import BulkScorer, Lexicon
+
+
+@pytest.fixture
+def scorer():
+    return BulkScorer(Lexicon({"good": (0.7, 0.6), "bad": (-0.7, 0.7), "movie": (0.0, 0.0)}))
+
+
+def dense(data, indices, indptr, words):
+    matrix = np.zeros((len(indptr) - 1, words), dtype=np.int64)
+    for row in range(len(indptr) - 1):
+        matrix[row, indices[indptr[row]:indptr[row + 1]]] = data[indptr[row]:indptr[row + 1]]
+    return matrix
+
+
+def test_encode_gives_extra_words_ids_after_lexicon(scorer):
+    token_ids, doc_ids, extra = scorer.encode(["Good plot", "plot, bad PLOT"])
+
+    assert token_ids.tolist() == [0, 3, 3, 1, 3]
+    assert doc_ids.tolist() == [0, 0, 1, 1, 1]
+    assert extra == ["plot"]
+
+
+def test_count_matrix_matches_dense_counts(scorer):
+    texts = ["good good movie", "", "bad plot good", "plot"]
+    token_ids, doc_ids, extra = scorer.encode(texts)
+    words = len(scorer.lexicon) + len(extra)
+
+    data, indices, indptr = scorer.count_matrix(token_ids, doc_ids, len(texts), words)
+
+    assert indptr.tolist() == [0, 2, 2, 5, 6]
+    assert dense(data, indices, indptr, words).tolist() == [
+        [2, 0, 1, 0],
+        [0, 0, 0, 0],
+        [1, 1, 0, 1],
+        [0, 0, 0, 1]]
+
+
+def test_count_matrix_of_empty_batch(scorer):
+    token_ids, doc_ids, _ = scorer.encode(["", ""])
+    data, indices, indptr = scorer.count_matrix(token_ids, doc_ids, 2, len(scorer.lexicon))
+
+    assert data.size == indices.size == 0
+    assert indptr.tolist() == [0, 0, 0]
+
+
+def test_score_averages_lexicon_words(scorer):
+    result = scorer.score(["good good bad plot", "plot only", "movie"])
+
+    assert result["polarity"] == pytest.approx([0.7 / 3, 0.0, 0.0])
+    assert result["subjectivity"] == pytest.approx([1.9 / 3, 0.0, 0.0])
+
+
+def test_score_top_terms_include_unknown_words(scorer):
+    result = scorer.score(["good plot plot", "plot bad good"], top=2)
+
+    assert result["top-terms"] == {"plot": 3, "good": 2}
@@ -0,0 +1,102 @@
+from collections import Counter
+import random
+import pytest
+from core.corpus import CorpusStats, CountMinSketch
+
+
+def documents(count, seed=1):
+    rng = random.Random(seed)
+    vocabulary = ['w%d' % i for i in range(500)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    return [Counter(rng.choices(vocabulary, weights=weights, k=20)) for _ in range(count)]
+
+
+def test_sketch_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=4)
+    exact = Counter()
+    for document in documents(50):
+        for word, count in document.items():
+            sketch.add(word, count)
+            exact[word] += count
+
+    assert all(sketch.estimate(word) >= count for word, count in exact.items())
+
+
+def test_sketch_add_returns_estimate():
+    sketch = CountMinSketch(width=64)
+
+    assert sketch.add('word', 2) == 2
+    assert sketch.add('word', 3) == sketch.estimate('word') == 5
+
+
+def test_sketches_of_different_size_are_not_merged():
+    with pytest.raises(ValueError):
+        CountMinSketch(width=64).merge(CountMinSketch(width=128))
+
+
+def test_offer_keeps_heavy_size_candidates():
+    stats = CorpusStats(sketch_width=4096, heavy_size=2)
+    for word, estimate in [('a', 1), ('b', 2), ('c', 3), ('a', 2), ('d', 1)]:
+        stats._offer(word, estimate)
+
+    assert dict(stats.counts) == {'b': 2, 'c': 3}
+
+
+def test_offer_updates_existing_candidate():
+    stats = CorpusStats(sketch_width=4096, heavy_size=2)
+    for word, estimate in [('a', 1), ('b', 2), ('a', 5), ('c', 3)]:
+        stats._offer(word, estimate)
+
+    assert dict(stats.counts) == {'a': 5, 'c': 3}
+
+
+def test_offer_rebuilds_stale_heap():
+    stats = CorpusStats(sketch_width=4096, heavy_size=2)
+    for estimate in range(1, 20):
+        stats._offer('a', estimate)
+
+    assert len(stats.heap) <= 4 * stats.heavy_size
+    assert dict(stats.counts) == {'a': 19}
+
+
+def test_rerank_keeps_top_candidates():
+    stats = CorpusStats(sketch_width=4096, heavy_size=2)
+    for word, count in [('a', 5), ('b', 1), ('c', 3)]:
+        stats.sketch.add(word, count)
+    stats.counts.update({'a': 0, 'b': 0})
+
+    stats._rerank(['c'])
+
+    assert dict(stats.counts) == {'a': 5, 'c': 3}
+    assert sorted(stats.heap) == [(3, 'c'), (5, 'a')]
+
+
+def test_sketched_top_terms_match_exact():
+    exact, sketched = CorpusStats(), CorpusStats(sketch_width=4096, heavy_size=50)
+    for document in documents(300):
+        exact.add_document(document, 0.1, 0.2)
+        sketched.add_document(document, 0.1, 0.2)
+
+    expected = exact.summary(5)
+    summary = sketched.summary(5)
+
+    assert list(summary['top-terms']) == list(expected['top-terms'])
+    assert summary['approximate'] and not expected['approximate']
+
+
+@pytest.mark.parametrize('sketch_width', [None, 4096])
+def test_merged_shards_equal_whole_corpus(sketch_width):
+    corpus = documents(200)
+    whole = CorpusStats(sketch_width=sketch_width)
+    left, right = CorpusStats(sketch_width=sketch_width), CorpusStats(sketch_width=sketch_width)
+    for i, document in enumerate(corpus):
+        polarity = (i % 3 - 1) / 2
+        whole.add_document(document, polarity, 0.5)
+        (left if i % 2 else right).add_document(document, polarity, 0.5)
+
+    assert left.merge(right).summary(10) == whole.summary(10)
+
+
+def test_exact_and_sketched_stats_are_not_merged():
+    with pytest.raises(ValueError):
+        CorpusStats().merge(CorpusStats(sketch_width=4096))
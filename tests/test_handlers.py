@@ -0,0 +1,34 @@
+from utils.handlers import compact_response
+
+
+def expand(compact):
+    strings = compact["strings"]
+
+    def restore(value):
+        if isinstance(value, dict):
+            return {k: restore(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [restore(v) for v in value]
+        if isinstance(value, int) and not isinstance(value, bool):
+            return strings[value]
+        return value
+
+    return restore(compact["data"])
+
+
+def test_compact_response_interns_repeated_strings():
+    response = {"synonyms": {"good": ["well", "good"], "fine": ["well", "good"]}}
+    compact = compact_response(response)
+
+    assert compact["strings"] == ["well", "good"]
+    assert compact["data"] == {"synonyms": {"good": [0, 1], "fine": [0, 1]}}
+    assert expand(compact) == response
+
+
+def test_compact_response_keeps_keys_and_numbers():
+    response = {"count-words": {"word": 3}, "status": {"correct": {"status": "ok", "time": 0.5}}}
+    compact = compact_response(response)
+
+    assert compact["strings"] == ["ok"]
+    assert compact["data"] == {"count-words": {"word": 3}, "status": {"correct": {"status": 0, "time": 0.5}}}
+
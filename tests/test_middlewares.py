@@ -0,0 +1,84 @@
+import asyncio
+import gzip
+import brotli
+import pytest
+from utils.middlewares import CompressionMiddleware, accepts_encoding
+
+
+BODY = b"analysis " * 200
+
+
+def make_app(chunks):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"text/plain")]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+def request(app, accept_encoding):
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=500)(scope, receive, send))
+
+    start, *bodies = messages
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    return headers, b"".join(x.get("body", b"") for x in bodies)
+
+
+@pytest.mark.parametrize("header, encoding, expected", [
+    ("br", "br", True),
+    ("gzip, deflate, br", "br", True),
+    ("gzip;q=1.0, br;q=0.5", "br", True),
+    ("br;q=0", "br", False),
+    ("gzip, *;q=0.1", "br", True),
+    ("*, br;q=0", "br", False),
+    ("BR", "br", True),
+    ("brotli", "br", False),
+    ("", "br", False),
+])
+def test_accepts_encoding(header, encoding, expected):
+    assert accepts_encoding(header, encoding) is expected
+
+
+def test_brotli_single_body():
+    headers, body = request(make_app([BODY]), "gzip, br")
+
+    assert headers["content-encoding"] == "br"
+    assert headers["content-length"] == str(len(body))
+    assert "Accept-Encoding" in headers["vary"]
+    assert brotli.decompress(body) == BODY
+
+
+def test_brotli_streamed_body():
+    headers, body = request(make_app([BODY, BODY, b"end"]), "br")
+
+    assert headers["content-encoding"] == "br"
+    assert "content-length" not in headers
+    assert brotli.decompress(body) == BODY + BODY + b"end"
+
+
+def test_small_body_is_not_compressed():
+    headers, body = request(make_app([b"short"]), "br")
+
+    assert "content-encoding" not in headers
+    assert body == b"short"
+
+
+def test_refused_brotli_falls_back_to_gzip():
+    headers, body = request(make_app([BODY]), "gzip, br;q=0")
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body) == BODY
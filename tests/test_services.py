@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from core.database import DataBase
+from core.services import AnalysisService
+from models.analyses import Analysis
+from models.users import User
+
+
+@pytest.fixture
+def database():
+    engine = create_engine("sqlite://")
+    DataBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(database):
+    user = User(username="reader", email="reader@example.com", password="hash")
+    database.add(user)
+    database.commit()
+    return user
+
+
+def add_analyses(database, user, count):
+    for i in range(count):
+        analysis = Analysis(user_id=user.id, text_hash=str(i), methods="count-words")
+        analysis.result = {"count-words": {"word": i}}
+        database.add(analysis)
+    database.commit()
+
+
+def collect_pages(service, user, limit):
+    pages, before = [], None
+    while True:
+        page = service.get_analyses(user=user, before=before, limit=limit)
+        pages.append([x.id for x in page["items"]])
+        before = page["next_cursor"]
+        if before is None:
+            return pages
+
+
+def test_pages_cover_history_newest_first(database, user):
+    add_analyses(database, user, 5)
+    pages = collect_pages(AnalysisService(database=database), user, limit=2)
+
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_full_last_page_has_no_cursor(database, user):
+    add_analyses(database, user, 4)
+    pages = collect_pages(AnalysisService(database=database), user, limit=2)
+
+    assert pages == [[4, 3], [2, 1]]
+
+
+def test_cursor_is_last_returned_id(database, user):
+    add_analyses(database, user, 3)
+    page = AnalysisService(database=database).get_analyses(user=user, limit=2)
+
+    assert page["next_cursor"] == page["items"][-1].id == 2
+
+
+def test_other_users_are_not_listed(database, user):
+    other = User(username="writer", email="writer@example.com", password="hash")
+    database.add(other)
+    database.commit()
+    add_analyses(database, other, 3)
+
+    page = AnalysisService(database=database).get_analyses(user=user)
+
+    assert page == {"items": [], "next_cursor": None}
+
+
+def test_result_is_stored_compressed(database, user):
+    add_analyses(database, user, 1)
+    analysis = database.query(Analysis).one()
+
+    assert isinstance(analysis.compressed_result, bytes)
+    assert analysis.result == {"count-words": {"word": 0}}
@@ -1,38 +1,158 @@
-from typing import Union, Dict, Tuple, List
-from core.analyzers import Analyzer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, List, Any, Set
+import asyncio
+import time
+from core.analyzers import Analyzer, DeadlineExceeded, method_deadline
+from core.registry import registry, Cost, AnalysisMethod
+from utils.settings import analysis_config, translation_config
 
 
-async def text_handler(method: List, text: str) -> Dict[str, Union[str, Tuple, Dict]]:
+COST_ORDER: List[Cost] = [Cost.remote, Cost.expensive, Cost.cheap]
+DEADLINE_SHARE: Dict[Cost, float] = {Cost.remote: 1.0, Cost.expensive: 1.0, Cost.cheap: 0.5}
+
+# Определение языка и перевод на английский уходят в сеть, если это разрешено настройками
+TRANSLATION_COST = Cost.remote if (translation_config.TRANSLATION_BACKEND == 'remote'
+                                   or translation_config.REMOTE_FALLBACK) else Cost.cheap
+INPUT_COST: Dict[str, Cost] = {'language': TRANSLATION_COST, 'text': TRANSLATION_COST}
+
+executor = ThreadPoolExecutor(max_workers=analysis_config.ANALYSIS_WORKERS, thread_name_prefix='analysis')
+
+
+def method_inputs(item: AnalysisMethod) -> Set[str]:
+
+    """
+    Промежуточные данные, которые готовятся для метода. Язык нужен всем методам.
+    """
+
+    uses = set(item.uses) | {'language'}
+    if item.needs_english:
+        uses.add('text')
+    return uses
+
+
+def effective_cost(item: AnalysisMethod) -> Cost:
+
+    """
+    Стоимость метода с учетом его входных данных: дешевый метод, ждущий перевода, считается удаленным.
+    """
+
+    costs = [item.cost] + [INPUT_COST[x] for x in method_inputs(item) if x in INPUT_COST]
+    return min(costs, key=COST_ORDER.index)
+
+
+def run_method(analyzer: Analyzer, item: AnalysisMethod, deadline: float) -> Any:
+
+    """
+    Готовит промежуточные данные метода и выполняет его. Вызывается в пуле executor.
+    Дедлайн метода виден анализатору через method_deadline.
+    """
+
+    token = method_deadline.set(deadline)
+    try:
+        analyzer.prepare(method_inputs(item))
+        return item.func(analyzer)
+    finally:
+        method_deadline.reset(token)
+
+
+async def timed_method(analyzer: Analyzer, item: AnalysisMethod, deadline: float) -> Tuple[Any, Dict]:
+
+    """
+    Выполняет метод с ограничением по времени.
+
+    Returns:
+        [Tuple]: Результат (или None) и статус: ok / timeout / error и время выполнения.
+    """
+
+    started = time.monotonic()
+    loop = asyncio.get_event_loop()
+
+    try:
+        future = loop.run_in_executor(executor, run_method, analyzer, item, deadline)
+        result = await asyncio.wait_for(future, timeout=max(0.0, deadline - started))
+        status = {"status": "ok"}
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        result, status = None, {"status": "timeout"}
+    except Exception as exc:
+        result, status = None, {"status": "error", "detail": type(exc).__name__}
+
+    status["time"] = round(time.monotonic() - started, 3)
+    return result, status
+
+
+def language_status(analyzer: Analyzer) -> Dict[str, str]:
+
+    """
+    Статус определения языка: ok, error (язык принят за 'en') или timeout, если до него не дошли.
+    """
+
+    if 'language' not in analyzer.values:
+        return {"status": "timeout"}
+    if analyzer.language_error:
+        return {"status": "error", "detail": analyzer.language_error, "language": analyzer.language}
+
+    return {"status": "ok", "language": analyzer.language}
+
+
+async def text_handler(method: List, text: str, budget: float = analysis_config.REQUEST_BUDGET) -> Dict[str, Dict]:
 
     """
     Функция, обрабатывающая текст, введенный в текстовое поле или отправленный в файле.
 
-    Возвращает список результатов анализа, в зависимости от выбора.
-    """
-
-    response: Dict = {}
-    analyzer = Analyzer(text)
-
-    if 'translate' in method:
-        translate_response = await analyzer.ru_translate()
-        response['translate'] = translate_response
-    if 'definitions' in method:
-        define_resp = await analyzer.get_definitions()
-        response['definitions'] = define_resp
-    if 'correct' in method:
-        corr_resp = await analyzer.get_correct()
-        response['correct'] = corr_resp
-    if 'emocolor' in method:
-        emocolor_response = await analyzer.text_polarity()
-        response['emotional-color'] = emocolor_response
-    if 'count-words' in method:
-        count_response = await analyzer.wordcount()
-        response['count-words'] = count_response
-    if 'synonyms' in method:
-        syn_response = await analyzer.get_synonyms()
-        response['synonyms'] = syn_response
-    if 'antonyms' in method:
-        ant_response = await analyzer.get_antonyms()
-        response['antonyms'] = ant_response
-
-    return response
+    Методы берутся из реестра и выполняются параллельно в отдельном ограниченном пуле потоков.
+    Общие промежуточные данные, включая определение языка, считаются один раз и лениво
+    (перевод на английский - только если он кому-то нужен).
+
+    У каждого метода свой дедлайн - доля от budget секунд, зависящая от самой высокой стоимости
+    среди метода и его входных данных (effective_cost).
+    Метод, не успевший к дедлайну или упавший, не задерживает и не ломает остальные:
+    ожидание его отменяется, а в status попадает причина. Сам метод останавливается
+    на ближайшей проверке дедлайна (между словами), а переводчику дедлайн передается как timeout.
+
+    Возвращает результаты завершенных методов и статус с временем каждого метода и определения языка.
+    """
+
+    analyzer = Analyzer(text, deadline=time.monotonic() + budget)
+    selected = [x for name, x in registry.items() if name in method]
+
+    costs = {x.key: effective_cost(x) for x in selected}
+    ordered = sorted(selected, key=lambda x: COST_ORDER.index(costs[x.key]))
+    outcomes = await asyncio.gather(*(
+        timed_method(analyzer, x, time.monotonic() + budget * DEADLINE_SHARE[costs[x.key]]) for x in ordered))
+    finished = dict(zip((x.key for x in ordered), outcomes))
+
+    status = {x.key: finished[x.key][1] for x in selected}
+    status["language"] = language_status(analyzer)
+
+    return {
+        "results": {x.key: finished[x.key][0] for x in selected if finished[x.key][1]["status"] == "ok"},
+        "status": status}
+
+
+def compact_response(response: Dict) -> Dict[str, Any]:
+
+    """
+    Компактный формат ответа.
+
+    Все строковые значения (не ключи) складываются в общую таблицу strings,
+    а в data заменяются на индекс в этой таблице. Повторяющиеся леммы
+    из синонимов и определений передаются один раз.
+    """
+
+    strings: List[str] = []
+    index: Dict[str, int] = {}
+
+    def intern(value: Any) -> Any:
+        if isinstance(value, str):
+            if value not in index:
+                index[value] = len(strings)
+                strings.append(value)
+            return index[value]
+        if isinstance(value, dict):
+            return {k: intern(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [intern(v) for v in value]
+        return value
+
+    data = intern(response)
+    return {"strings": strings, "data": data}
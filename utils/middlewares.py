@@ -0,0 +1,150 @@
+"""
+Модуль со сжатием ответов.
+
+[CompressionMiddleware]
+    Выбирает brotli или gzip по заголовку Accept-Encoding.
+
+[BrotliResponder]
+    Сжимает тело ответа brotli. Устроен так же, как GZipResponder из starlette.
+
+[accepts encoding]
+    Разбор Accept-Encoding с учетом q-значений.
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepts_encoding(header: str, encoding: str) -> bool:
+
+    """
+    Принимает ли клиент encoding: токены через запятую, у каждого может быть ;q=...
+    Явно указанная кодировка важнее "*". q=0 означает отказ.
+    """
+
+    weights: Dict[str, float] = {}
+
+    for item in header.split(","):
+        name, *params = [x.strip() for x in item.split(";")]
+        if not name:
+            continue
+
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+
+        weights[name.lower()] = weight
+
+    weight = weights.get(encoding, weights.get("*", 0.0))
+    return weight > 0
+
+
+class CompressionMiddleware:
+
+    """
+    [Compression]
+
+    Если клиент принимает br и установлен brotli, ответ сжимается brotli,
+    иначе работа делегируется GZipMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+
+        if scope["type"] == "http" and brotli is not None:
+            headers = Headers(scope=scope)
+            if accepts_encoding(headers.get("Accept-Encoding", ""), "br"):
+                responder = BrotliResponder(self.app, self.minimum_size)
+                await responder(scope, receive, send)
+                return
+
+        await self.gzip(scope, receive, send)
+
+
+class BrotliResponder:
+
+    """
+    [Brotli]
+
+    Маленькие ответы отдаются как есть, большие сжимаются,
+    потоковые сжимаются по частям.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = brotli.Compressor()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    async def send_with_brotli(self, message: Message) -> None:
+
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.initial_message = message
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+
+            if "content-encoding" in headers or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            headers["Content-Encoding"] = "br"
+            headers.add_vary_header("Accept-Encoding")
+
+            if more_body:
+                del headers["Content-Length"]
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": self.compressor.process(body), "more_body": True})
+                return
+
+            compressed = self.compressor.process(body) + self.compressor.finish()
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.initial_message)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        chunk = self.compressor.process(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,4 +1,5 @@
 from pydantic import BaseSettings
+from pathlib import Path
 
 
 class TokenConfig(BaseSettings):
@@ -20,5 +21,31 @@ class EmailConfig(BaseSettings):
     HTTP_URL: str = "http://localhost:8000/me"
 
 
+class TranslationConfig(BaseSettings):
+
+    """
+    Офлайн-таблица переводит пословно, без согласования форм ("I love you" -> "Я любить ты").
+    Ее перевода хватает для анализа (частоты, тональность), но не для показа пользователю,
+    поэтому метод translate по умолчанию идет в удаленный переводчик (OFFLINE_USER_TRANSLATION).
+    """
+
+    TRANSLATION_BACKEND: str = 'offline'
+    PHRASE_TABLE: str = str(Path(__file__).resolve().parent.parent / 'data' / 'en_ru.tsv')
+    REMOTE_FALLBACK: bool = True
+    OFFLINE_USER_TRANSLATION: bool = False
+    MIN_COVERAGE: float = 0.9
+    CACHE_SIZE: int = 10000
+
+
+class AnalysisConfig(BaseSettings):
+
+    REQUEST_BUDGET: float = 10.0
+    MAX_REQUEST_BUDGET: float = 60.0
+    CORPUS_PROCESSES: int = 2
+    ANALYSIS_WORKERS: int = 8
+
+
 token_config = TokenConfig()
 email_config = EmailConfig()
+translation_config = TranslationConfig()
+analysis_config = AnalysisConfig()